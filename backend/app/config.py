@@ -11,6 +11,11 @@ def load_config():
     parser.add_argument("--port", default=int(os.getenv("PORT", 5487)), type=int, help="Port for the server")
     parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"), help="Log level for the application")
     parser.add_argument("--refresh-rate", default=int(os.getenv("REFRESH_RATE", 10)), type=int, help="Frequency of state updates in Hz (default 10Hz)")
+    parser.add_argument("--snapshot-path", default=os.getenv("SNAPSHOT_PATH", "robot_snapshot.bin"), help="File used to persist robot state across restarts")
+    parser.add_argument("--snapshot-interval", default=float(os.getenv("SNAPSHOT_INTERVAL", 5)), type=float, help="Seconds between state snapshots, 0 disables them (default 5s)")
+    parser.add_argument("--telemetry-path", default=os.getenv("TELEMETRY_PATH", "robot_telemetry.bin"), help="File where per-tick telemetry is recorded for export")
+    parser.add_argument("--telemetry-max-bytes", default=int(os.getenv("TELEMETRY_MAX_BYTES", 10 * 1024 * 1024)), type=int, help="Rotate the telemetry file at this size, 0 disables recording (default 10 MB)")
+    parser.add_argument("--telemetry-backup-count", default=int(os.getenv("TELEMETRY_BACKUP_COUNT", 3)), type=int, help="Number of rotated telemetry files to keep (default 3)")
     return parser.parse_args()
 
 config = load_config()
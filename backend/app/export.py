@@ -0,0 +1,49 @@
+import argparse
+import os
+from dotenv import load_dotenv
+from models import ExportFormat
+from utils.telemetry import EXPORT_ENCODERS, iter_telemetry_chunks
+from utils.time_utils import parse_timestamp
+
+load_dotenv()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Export recorded robot telemetry to a file")
+
+    parser.add_argument("--telemetry-path", default=os.getenv("TELEMETRY_PATH", "robot_telemetry.bin"), help="Recorded telemetry file")
+    parser.add_argument("--from", dest="start", type=parse_timestamp, help="Unix timestamp or ISO 8601 date/time (inclusive)")
+    parser.add_argument("--to", dest="end", type=parse_timestamp, help="Unix timestamp or ISO 8601 date/time (exclusive)")
+    parser.add_argument("--format", default=ExportFormat.CSV, type=ExportFormat, choices=[f.value for f in ExportFormat], help="Output format (default csv)")
+    parser.add_argument("--output", required=True, help="Destination file")
+    return parser
+
+def export_telemetry(telemetry_path: str, output_path: str, start: float | None, end: float | None, format: ExportFormat) -> int:
+    """
+    Stream telemetry into `output_path` chunk by chunk. Returns bytes written.
+
+    The output file is only created once the telemetry files are open, and is
+    removed again if the export fails part way.
+
+    Raises:
+        FileNotFoundError: If no telemetry was recorded at `telemetry_path`.
+    """
+    encoder, _ = EXPORT_ENCODERS[format]
+    chunks = iter_telemetry_chunks(telemetry_path, start, end)
+    written = 0
+    try:
+        with open(output_path, "wb") as f:
+            for data in encoder(chunks):
+                written += f.write(data)
+    except BaseException:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    return written
+
+if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    if not os.path.exists(args.telemetry_path):
+        parser.error(f"telemetry file not found: {args.telemetry_path}")
+    written = export_telemetry(args.telemetry_path, args.output, args.start, args.end, args.format)
+    print(f"Exported {written} bytes to {args.output}")
@@ -1,12 +1,15 @@
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 import asyncio
 from utils.logging import configure_logging, LogLevel
 from utils.files import read_last_lines
+from utils.telemetry import TelemetryRecorder, EXPORT_ENCODERS, iter_telemetry_chunks
+from utils.time_utils import parse_timestamp
 from services.robot_service import RobotService, robot_service
-from models import RobotControlCommand, RobotState, RobotAction
+from services.command_queue import IdempotencyKeyConflict
+from models import RobotControlCommand, RobotState, StateSubscription, ExportFormat
 import logging
 from pydantic import ValidationError
 from websockethub import WebSocketHub
@@ -30,11 +33,48 @@ def get_robot_service():
 async def start_robot_service():
     await robot_service.generate_state_periodically()
 
+def get_robot_states() -> dict[str, dict]:
+    state = robot_service.get_robot_state()
+    if state is None:
+        return {}
+    return {robot_service.robot_id: state.model_dump(mode="json", exclude={"logs"})}
+
+async def start_state_publisher():
+    await state_hub.publish_periodically(get_robot_states, config.refresh_rate)
+
+def restore_robot_service():
+    if config.snapshot_interval <= 0 or not os.path.exists(config.snapshot_path):
+        return
+    try:
+        robot_service.load_snapshot(config.snapshot_path)
+    except (ValueError, OSError) as e:
+        logging.warning(f"Ignoring unreadable snapshot {config.snapshot_path}: {str(e)}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    restore_robot_service()
+    if config.telemetry_max_bytes > 0:
+        robot_service.telemetry = TelemetryRecorder(config.telemetry_path, config.telemetry_max_bytes, config.telemetry_backup_count)
     asyncio.create_task(start_robot_service())
+    asyncio.create_task(start_state_publisher())
+    snapshot_task = None
+    if config.snapshot_interval > 0:
+        snapshot_task = asyncio.create_task(robot_service.save_snapshot_periodically(config.snapshot_path, config.snapshot_interval))
     yield
     print("Shutting down...")
+    # apply commands already acknowledged to clients before persisting state
+    robot_service.apply_pending_commands()
+    try:
+        if snapshot_task is not None:
+            # waits for an in-flight periodic write so it cannot land after the final one
+            snapshot_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await snapshot_task
+            await robot_service.save_snapshot_async(config.snapshot_path)
+    finally:
+        if robot_service.telemetry is not None:
+            robot_service.telemetry.close()
+            robot_service.telemetry = None
 
 app = FastAPI(lifespan=lifespan)
 configure_logging(log_levels.get(config.log_level))
@@ -80,39 +120,44 @@ async def get_state(robot_service: RobotService = Depends(get_robot_service)):
           tags=["robot"],
           response_model=dict[str, str]
       )
-async def control_robot(command: RobotControlCommand):
+async def control_robot(command: RobotControlCommand,
+                        idempotency_key: str | None = Header(default=None, max_length=128)):
     """
-    Accepts a control command for the robot and returns a confirmation message.
+    Accepts a control command for the robot and reports whether it was queued.
     Supported actions: on, off, reset, fan, fan_speed.
     If action is 'fan', a fan_mode must be specified.
     If action is 'fan_speed', a fan_speed must be specified and fan_mode must be 'static'.
+
+    Commands are queued and applied at the next state tick. Successive fan_speed
+    commands are coalesced, and retries carrying the same idempotency key
+    (in the body or the `Idempotency-Key` header) are applied only once.
+    Reusing a key for a different command is rejected with 409.
     """
     logging.debug(f"Received control command: {command}")
 
-    match command.action:
-        case RobotAction.ON:
-            logging.info("Turning robot ON")
-            robot_service.turn_on()
-        case RobotAction.OFF:
-            logging.info("Turning robot OFF")
-            robot_service.turn_off()
-        case RobotAction.RESET:
-            logging.info("Resetting robot")
-            robot_service.reset()
-        case RobotAction.FAN:
-            try:
-                logging.info(f"Setting fan mode to: {command.fan_mode}")
-                robot_service.set_fan_mode(command.fan_mode)
-            except Exception as e:
-                logging.info(f"{str(e)}")
-        case RobotAction.FAN_SPEED:
-            logging.info(f"Setting fan speed to {command.fan_speed}")
-            robot_service.set_fan_speed(command.fan_speed)
-        case _:
-            logging.warning(f"Unsupported action: {command.action}")
-            raise HTTPException(status_code=400, detail=f"Unsupported action: {command.action}")
-
-    return {"status": "success", "action": command.action}
+    if command.idempotency_key is None and idempotency_key is not None:
+        command.idempotency_key = idempotency_key
+    try:
+        queued = robot_service.enqueue_command(command)
+    except IdempotencyKeyConflict as e:
+        logging.warning(str(e))
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {"status": "queued" if queued else "duplicate", "action": command.action}
+
+@app.get(
+    "/control/queue",
+    summary="Get control command queue statistics",
+    tags=["robot"],
+    response_model=dict[str, int]
+)
+async def get_control_queue_stats():
+    """
+    Returns the current queue depth and how many commands were enqueued,
+    coalesced, deduplicated by idempotency key, applied and failed so far.
+    Failed also covers commands that had no effect (e.g. turning on a running robot).
+    """
+    return robot_service.command_queue.stats()
 
 @app.get(
     "/logs",
@@ -158,29 +203,87 @@ async def get_logs():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get(
+    "/export",
+    summary="Stream recorded telemetry",
+    tags=["robot"],
+    responses={
+        200: {
+            "description": "Telemetry rows streamed as CSV or an Arrow IPC stream",
+            "content": {"text/csv": {}, "application/vnd.apache.arrow.stream": {}},
+        },
+        400: {"description": "Invalid time range"},
+        404: {"description": "No telemetry recorded yet"},
+    },
+)
+async def export_telemetry(
+    from_: str | None = Query(default=None, alias="from", description="Unix timestamp or ISO 8601 date/time (inclusive)"),
+    to: str | None = Query(default=None, description="Unix timestamp or ISO 8601 date/time (exclusive)"),
+    format: ExportFormat = ExportFormat.CSV,
+):
+    """
+    Streams per-tick telemetry (temperature, power, status, fan speed) recorded
+    between `from` and `to`, including rotated telemetry files. Rows are read and
+    encoded chunk by chunk in a worker thread, so large ranges neither load fully
+    into memory nor block the event loop.
+    """
+    try:
+        start = None if from_ is None else parse_timestamp(from_)
+        end = None if to is None else parse_timestamp(to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        chunks = iter_telemetry_chunks(config.telemetry_path, start, end)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No telemetry recorded")
+
+    encoder, media_type = EXPORT_ENCODERS[format]
+    extension = "arrow" if format == ExportFormat.ARROW_IPC else "csv"
+    return StreamingResponse(
+        encoder(chunks),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="telemetry.{extension}"'},
+    )
+
 state_hub = WebSocketHub()
 control_hub = WebSocketHub()
 
+def cap_subscription_rate(subscription: StateSubscription) -> StateSubscription:
+    """State is only published at --refresh-rate, so faster rates cannot be honoured."""
+    if subscription.max_rate <= config.refresh_rate:
+        return subscription
+    return subscription.model_copy(update={"max_rate": float(config.refresh_rate)})
+
 @app.websocket("/ws/state")
 async def websocket_endpoint(websocket: WebSocket):
+    """
+    Streams robot state frames. Clients start with the default subscription
+    (all robots, all fields, 10 Hz) and may narrow it at any time by sending
+    e.g. {"action": "subscribe", "robot_ids": ["robot-1"], "fields": ["power"], "max_rate": 1}.
+    """
     await state_hub.connect(websocket)
+    state_hub.subscribe(websocket, cap_subscription_rate(StateSubscription()))
     try:
         while True:
-            state = robot_service.get_robot_state()
-            await state_hub.broadcast_json(
-            {
-                "temperature": state.temperature,
-                "power": state.power,
-                "status": state.status,
-                "fan_speed": state.fan_speed,
-                "uptime": state.uptime,
-            }, websocket
-            )
-            await asyncio.sleep(0.1) # 10 Hz
+            data = await websocket.receive_text()
+            try:
+                subscription = cap_subscription_rate(StateSubscription.model_validate_json(data))
+                state_hub.subscribe(websocket, subscription)
+                await state_hub.send_json({
+                                              "status": "subscribed",
+                                              **subscription.model_dump(mode="json", exclude={"action"}),
+                                          }, websocket)
+            except ValidationError as e:
+                await state_hub.send_json({
+                                              "status": "validation_error",
+                                              "detail": e.errors(include_context=False),
+                                              "code": 422,
+                                          }, websocket)
     except WebSocketDisconnect:
         state_hub.disconnect(websocket)
         logging.info("Client disconnected")
     except Exception as e:
+        state_hub.disconnect(websocket)
         logging.error(f"WebSocket error: {str(e)}")
 
 @app.websocket("/ws/control")
@@ -193,35 +296,17 @@ async def websocket_control(websocket: WebSocket):
                 command = RobotControlCommand(**data)
 
                 try:
-                    match command.action:
-                        case RobotAction.ON:
-                            logging.info("Turning robot ON")
-                            robot_service.turn_on()
-                        case RobotAction.OFF:
-                            logging.info("Turning robot OFF")
-                            robot_service.turn_off()
-                        case RobotAction.RESET:
-                            logging.info("Resetting robot")
-                            robot_service.reset()
-                        case RobotAction.FAN:
-                            logging.info(f"Setting fan mode to: {command.fan_mode}")
-                            robot_service.set_fan_mode(command.fan_mode)
-                        case RobotAction.FAN_SPEED:
-                            logging.info(f"Setting fan speed to {command.fan_speed}%")
-                            robot_service.set_fan_speed(command.fan_speed)
-                        case _:
-                            logging.warning(f"Unsupported action: {command.action}")
-                            raise HTTPException(status_code=400, detail=f"Unsupported action: {command.action}")
+                    queued = robot_service.enqueue_command(command)
                     await control_hub.broadcast_json({
-                                                "status": "success",
+                                                "status": "queued" if queued else "duplicate",
                                                 "action": command.action,
                                                 "fan_mode": command.fan_mode
                                               })
-                except HTTPException as e:
+                except IdempotencyKeyConflict as e:
                     await control_hub.broadcast_json({
                                                       "status": "error",
-                                                      "detail": e.detail,
-                                                      "code": e.status_code
+                                                      "detail": str(e),
+                                                      "code": 409
                                                   })
             except ValidationError as e:
                 await control_hub.broadcast_json({
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ValidationError, model_validator
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 from enum import Enum
 from dataclasses import dataclass
 from fastapi import HTTPException
@@ -21,6 +21,10 @@ class FanMode(str, Enum):
     PROPORTIONAL = "proportional"
     STATIC = "static"
 
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    ARROW_IPC = "arrow-ipc"
+
 class RobotState(BaseModel):
     temperature: Annotated[float, Field(ge=-100, le=500)]
     power: Annotated[float, Field(ge=0, le=100)] | None
@@ -29,10 +33,19 @@ class RobotState(BaseModel):
     uptime: Annotated[int, Field(ge=0, le=2**32 - 1)]
     logs: list[str]
 
+@dataclass
+class RobotSnapshot:
+    robot_id: str
+    status: RobotStatus
+    fan_mode: FanMode
+    fan_speed: int
+    start_time: float
+
 class RobotControlCommand(BaseModel):
     action: RobotAction
     fan_mode: Optional[FanMode] = None
     fan_speed: Optional[int] = None
+    idempotency_key: Optional[str] = Field(default=None, max_length=128)
 
     @model_validator(mode="after")
     def check_fan_mode_required(self):
@@ -42,3 +55,35 @@ class RobotControlCommand(BaseModel):
         if self.action == RobotAction.FAN_SPEED and self.fan_speed is None:
             raise HTTPException(status_code=422, detail="fan_speed is required when action is FAN_SPEED")
         return self
+
+class StateField(str, Enum):
+    TEMPERATURE = "temperature"
+    POWER = "power"
+    STATUS = "status"
+    FAN_SPEED = "fan_speed"
+    UPTIME = "uptime"
+
+class StateSubscription(BaseModel):
+    """
+    Filter sent by a /ws/state client to select which robots and fields it
+    receives and how often. Omitted robot_ids/fields mean "all".
+    """
+    action: Literal["subscribe"] = "subscribe"
+    robot_ids: Optional[list[str]] = None
+    fields: Optional[list[StateField]] = None
+    max_rate: Annotated[float, Field(gt=0, le=100)] = 10
+
+    def key(self) -> tuple:
+        """Hashable identity used to group subscribers with identical filters."""
+        robot_ids = None if self.robot_ids is None else tuple(sorted(set(self.robot_ids)))
+        fields = None if self.fields is None else tuple(sorted({f.value for f in self.fields}))
+        return (robot_ids, fields, self.max_rate)
+
+    def matches(self, robot_id: str) -> bool:
+        return self.robot_ids is None or robot_id in self.robot_ids
+
+    def select(self, robot_id: str, state: dict) -> dict:
+        fields = StateField if self.fields is None else self.fields
+        frame = {"robot_id": robot_id}
+        frame.update({f.value: state[f.value] for f in fields})
+        return frame
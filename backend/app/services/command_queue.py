@@ -0,0 +1,85 @@
+from collections import OrderedDict, deque
+from models import RobotAction, RobotControlCommand
+
+class IdempotencyKeyConflict(ValueError):
+    """An idempotency key was reused for a command with a different payload."""
+
+def command_fingerprint(command: RobotControlCommand) -> tuple:
+    return (command.action, command.fan_mode, command.fan_speed)
+
+class CommandQueue:
+    """
+    Pending control commands for a single robot, drained at tick boundaries.
+
+    Successive FAN_SPEED commands are coalesced into the last one and
+    retries carrying an already seen idempotency key are dropped. Reusing a
+    key for a different command raises IdempotencyKeyConflict.
+    """
+    def __init__(self, max_remembered_keys: int = 1024):
+        self.pending: deque[RobotControlCommand] = deque()
+        self.seen_keys: OrderedDict[str, tuple] = OrderedDict()
+        self.max_remembered_keys = max_remembered_keys
+        self.enqueued: int = 0
+        self.coalesced: int = 0
+        self.deduplicated: int = 0
+        self.applied: int = 0
+        self.failed: int = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def _remember(self, command: RobotControlCommand) -> bool:
+        key = command.idempotency_key
+        fingerprint = command_fingerprint(command)
+        if key in self.seen_keys:
+            if self.seen_keys[key] != fingerprint:
+                raise IdempotencyKeyConflict(f"Idempotency key {key} was already used for a different command")
+            self.seen_keys.move_to_end(key)
+            return False
+        self.seen_keys[key] = fingerprint
+        if len(self.seen_keys) > self.max_remembered_keys:
+            self.seen_keys.popitem(last=False)
+        return True
+
+    def put(self, command: RobotControlCommand) -> bool:
+        """
+        Queue a command. Returns False if it was a duplicate retry and got dropped.
+
+        Raises:
+            IdempotencyKeyConflict: If its key was used for a different command.
+        """
+        if command.idempotency_key is not None and not self._remember(command):
+            self.deduplicated += 1
+            return False
+
+        self.enqueued += 1
+        if (command.action == RobotAction.FAN_SPEED
+                and self.pending
+                and self.pending[-1].action == RobotAction.FAN_SPEED):
+            self.pending[-1] = command
+            self.coalesced += 1
+        else:
+            self.pending.append(command)
+        return True
+
+    def drain(self) -> list[RobotControlCommand]:
+        commands = list(self.pending)
+        self.pending.clear()
+        return commands
+
+    def record_result(self, applied: bool):
+        """Count a drained command as applied or as failed/no-op."""
+        if applied:
+            self.applied += 1
+        else:
+            self.failed += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "depth": len(self.pending),
+            "enqueued": self.enqueued,
+            "coalesced": self.coalesced,
+            "deduplicated": self.deduplicated,
+            "applied": self.applied,
+            "failed": self.failed,
+        }
@@ -2,12 +2,16 @@ import random
 import time
 import logging
 from utils.time_utils import to_uint32
-from models import RobotState, RobotStatus, FanMode
+from models import RobotState, RobotStatus, FanMode, RobotAction, RobotControlCommand, RobotSnapshot
+from utils.snapshot import encode_snapshot, read_snapshot, write_snapshot
+from utils.telemetry import TelemetryRecorder
+from services.command_queue import CommandQueue
 import asyncio
 from config import config
 
 class RobotService:
-    def __init__(self):
+    def __init__(self, robot_id: str = "robot-1"):
+        self.robot_id: str = robot_id
         self.status: RobotStatus = RobotStatus.IDLE
         self.start_time: float= time.time()
         self.uptime: int = 0
@@ -21,10 +25,16 @@ class RobotService:
         self.logger = logging.getLogger(__name__)
         self.robot_state = None
         self.refresh_rate = config.refresh_rate
+        self.command_queue = CommandQueue()
+        self.snapshot_lock = asyncio.Lock()
+        self.telemetry: TelemetryRecorder | None = None
+        self.telemetry_failures: int = 0
+        self.max_telemetry_failures: int = 3
 
     def __repr__(self):
         return (
-            f"<RobotService(status={self.status}, "
+            f"<RobotService(robot_id={self.robot_id}, "
+            f"status={self.status}, "
             f"uptime={self.uptime}s, "
             f"fan_speed={self.fan_speed}%, "
             f"fan_mode={self.fan_mode}, "
@@ -84,12 +94,133 @@ class RobotService:
 
     async def generate_state_periodically(self):
         while True:
+            self.apply_pending_commands()
             self.robot_state= self.get_state()
+            if self.telemetry is not None:
+                self.record_telemetry()
             await asyncio.sleep(1 / self.refresh_rate)
 
+    def record_telemetry(self):
+        """
+        Record the current state without ever letting telemetry errors stop
+        the state loop. The recorder is disabled after repeated failures.
+        """
+        try:
+            self.telemetry.record(self.robot_state, time.time())
+            self.telemetry_failures = 0
+        except (OSError, ValueError) as e:
+            # ValueError covers writes to a file left closed by a failed rollover
+            self.telemetry_failures += 1
+            self.logger.error(f"Failed to record telemetry: {str(e)}")
+            if self.telemetry_failures >= self.max_telemetry_failures:
+                self.logger.error("Disabling telemetry recording after repeated failures")
+                try:
+                    self.telemetry.close()
+                except OSError:
+                    pass
+                self.telemetry = None
+
     def get_robot_state(self):
         return self.robot_state
 
+    def snapshot(self) -> RobotSnapshot:
+        return RobotSnapshot(
+            robot_id = self.robot_id,
+            status = self.status,
+            fan_mode = self.fan_mode,
+            fan_speed = self.fan_speed,
+            start_time = self.start_time,
+        )
+
+    def restore(self, snapshot: RobotSnapshot):
+        # compute everything first so a bad snapshot leaves the current state untouched
+        status = RobotStatus(snapshot.status)
+        fan_mode = FanMode(snapshot.fan_mode)
+        if not 0 <= snapshot.fan_speed <= 100:
+            raise ValueError(f"Invalid fan speed in snapshot: {snapshot.fan_speed}")
+        uptime = to_uint32(time.time() - snapshot.start_time)
+
+        self.status = status
+        self.fan_mode = fan_mode
+        self.fan_speed = snapshot.fan_speed
+        self.start_time = snapshot.start_time
+        self.uptime = uptime
+        self.logger.info(f"Restored robot state from snapshot: {self}")
+
+    def save_snapshot(self, file_path: str):
+        write_snapshot(file_path, encode_snapshot([self.snapshot()]))
+
+    def load_snapshot(self, file_path: str) -> bool:
+        """
+        Restore state from a snapshot file written by `save_snapshot`.
+        Returns False if the file has no record for this robot.
+        """
+        for snapshot in read_snapshot(file_path):
+            if snapshot.robot_id == self.robot_id:
+                self.restore(snapshot)
+                return True
+        return False
+
+    async def save_snapshot_async(self, file_path: str):
+        """
+        Write a snapshot from a worker thread. Writes are serialised by
+        `snapshot_lock`, and a cancelled caller still waits for its write to
+        finish, so an older snapshot can never replace a newer one.
+        """
+        async with self.snapshot_lock:
+            data = encode_snapshot([self.snapshot()])
+            write = asyncio.ensure_future(asyncio.to_thread(write_snapshot, file_path, data))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                await write
+                raise
+
+    async def save_snapshot_periodically(self, file_path: str, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.save_snapshot_async(file_path)
+            except (ValueError, OSError) as e:
+                self.logger.error(f"Failed to write snapshot: {str(e)}")
+
+    def enqueue_command(self, command: RobotControlCommand) -> bool:
+        """
+        Queue a control command to be applied at the next tick.
+        Returns False if the command was dropped as a duplicate retry and
+        raises IdempotencyKeyConflict if its key belongs to another command.
+        """
+        queued = self.command_queue.put(command)
+        if not queued:
+            self.logger.debug(f"Ignoring duplicate command with key {command.idempotency_key}")
+        return queued
+
+    def apply_command(self, command: RobotControlCommand):
+        match command.action:
+            case RobotAction.ON:
+                return self.turn_on()
+            case RobotAction.OFF:
+                return self.turn_off()
+            case RobotAction.RESET:
+                return self.reset()
+            case RobotAction.FAN:
+                return self.set_fan_mode(command.fan_mode)
+            case RobotAction.FAN_SPEED:
+                return self.set_fan_speed(command.fan_speed)
+            case _:
+                raise ValueError(f"Unsupported action: {command.action}")
+
+    def apply_pending_commands(self) -> int:
+        commands = self.command_queue.drain()
+        for command in commands:
+            try:
+                applied = bool(self.apply_command(command))
+            except Exception as e:
+                self.logger.error(f"Failed to apply command {command.action}: {str(e)}")
+                applied = False
+            self.command_queue.record_result(applied)
+        return len(commands)
+
     def turn_on(self):
         self.logger.info(self.status)
         if self.status == RobotStatus.RUNNING:
@@ -0,0 +1,91 @@
+import math
+import os
+import struct
+import tempfile
+import zlib
+from models import RobotSnapshot, RobotStatus, FanMode
+
+SNAPSHOT_MAGIC = b"RSNP"
+SNAPSHOT_VERSION = 2
+
+# magic, version, record count, CRC-32 of the records
+HEADER = struct.Struct("<4sHII")
+# status, fan mode, fan speed, start time, robot id length
+RECORD = struct.Struct("<BBBdH")
+
+STATUSES = list(RobotStatus)
+FAN_MODES = list(FanMode)
+
+def encode_snapshot(snapshots: list[RobotSnapshot]) -> bytes:
+    """Pack robot snapshots into the compact binary snapshot format."""
+    parts = []
+    for snapshot in snapshots:
+        robot_id = snapshot.robot_id.encode("utf-8")
+        parts.append(RECORD.pack(
+            STATUSES.index(snapshot.status),
+            FAN_MODES.index(snapshot.fan_mode),
+            int(snapshot.fan_speed),
+            snapshot.start_time,
+            len(robot_id),
+        ))
+        parts.append(robot_id)
+    body = b"".join(parts)
+    return HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(snapshots), zlib.crc32(body)) + body
+
+def decode_snapshot(data: bytes) -> list[RobotSnapshot]:
+    """
+    Unpack robot snapshots produced by `encode_snapshot`.
+
+    Raises:
+        ValueError: If the data is truncated, fails its checksum, holds
+            out-of-range values or is not a supported snapshot.
+    """
+    try:
+        magic, version, count, crc = HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot (magic={magic!r}, version={version})")
+        if zlib.crc32(data[HEADER.size:]) != crc:
+            raise ValueError("Snapshot checksum mismatch")
+
+        snapshots = []
+        offset = HEADER.size
+        for _ in range(count):
+            status, fan_mode, fan_speed, start_time, id_length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            robot_id = data[offset:offset + id_length]
+            if len(robot_id) != id_length:
+                raise ValueError("Truncated snapshot")
+            offset += id_length
+            if fan_speed > 100:
+                raise ValueError(f"Invalid fan speed in snapshot: {fan_speed}")
+            if not math.isfinite(start_time):
+                raise ValueError(f"Invalid start time in snapshot: {start_time}")
+            snapshots.append(RobotSnapshot(
+                robot_id=robot_id.decode("utf-8"),
+                status=STATUSES[status],
+                fan_mode=FAN_MODES[fan_mode],
+                fan_speed=fan_speed,
+                start_time=start_time,
+            ))
+        return snapshots
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupted snapshot: {str(e)}") from e
+
+def write_snapshot(file_path: str, data: bytes) -> None:
+    """Atomically replace `file_path` with `data`."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def read_snapshot(file_path: str) -> list[RobotSnapshot]:
+    with open(file_path, "rb") as f:
+        return decode_snapshot(f.read())
@@ -0,0 +1,200 @@
+import io
+import math
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+from models import RobotState, RobotStatus, ExportFormat
+
+# timestamp, status, temperature, power, fan speed
+RECORD = struct.Struct("<dBffB")
+TIMESTAMP = struct.Struct("<d")
+
+STATUSES = list(RobotStatus)
+CSV_HEADER = "timestamp,status,temperature,power,fan_speed\n"
+
+def telemetry_files(file_path: str, backup_count: Optional[int] = None) -> list[str]:
+    """Existing telemetry files, oldest rotated backup first and `file_path` last."""
+    backups = []
+    index = 1
+    while backup_count is None or index <= backup_count:
+        backup = f"{file_path}.{index}"
+        if not os.path.exists(backup):
+            break
+        backups.append(backup)
+        index += 1
+    backups.reverse()
+    return backups + ([file_path] if os.path.exists(file_path) else [])
+
+def _last_timestamp(file_path: str) -> Optional[float]:
+    size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    count = size // RECORD.size
+    if count == 0:
+        return None
+    with open(file_path, "rb") as f:
+        f.seek((count - 1) * RECORD.size)
+        return TIMESTAMP.unpack(f.read(TIMESTAMP.size))[0]
+
+class TelemetryRecorder:
+    """
+    Appends one fixed-size binary record per robot state tick.
+
+    Like `RotatingFileHandler`, the file is rolled over to `.1`, `.2`, ...
+    once it would exceed `max_bytes` (0 means never), keeping `backup_count`
+    old files. Timestamps are kept non-decreasing across clock steps and
+    restarts, since readers rely on records being time ordered.
+    """
+    def __init__(self, file_path: str, max_bytes: int = 0, backup_count: int = 0):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        if os.path.exists(file_path):
+            # drop a partially written record left behind by a crash
+            size = os.path.getsize(file_path)
+            if size % RECORD.size:
+                os.truncate(file_path, size - size % RECORD.size)
+        self.last_timestamp: Optional[float] = _last_timestamp(file_path)
+        if self.last_timestamp is None and backup_count > 0:
+            self.last_timestamp = _last_timestamp(f"{file_path}.1")
+        self.file = open(file_path, "ab")
+
+    def should_rollover(self) -> bool:
+        return self.max_bytes > 0 and self.file.tell() + RECORD.size > self.max_bytes
+
+    def rollover(self):
+        self.file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.file_path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.file_path}.{index + 1}")
+            os.replace(self.file_path, f"{self.file_path}.1")
+        self.file = open(self.file_path, "wb")
+
+    def record(self, state: RobotState, timestamp: float):
+        if self.last_timestamp is not None:
+            timestamp = max(self.last_timestamp, timestamp)
+        self.last_timestamp = timestamp
+        if self.should_rollover():
+            self.rollover()
+        power = math.nan if state.power is None else state.power
+        self.file.write(RECORD.pack(timestamp, STATUSES.index(state.status), state.temperature, power, int(state.fan_speed)))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def _first_index_at_or_after(f, count: int, timestamp: float) -> int:
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(mid * RECORD.size)
+        (mid_timestamp,) = TIMESTAMP.unpack(f.read(TIMESTAMP.size))
+        if mid_timestamp < timestamp:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def _iter_file_chunks(f, start: Optional[float], end: Optional[float], chunk_size: int) -> Iterator[list[tuple]]:
+    count = os.fstat(f.fileno()).st_size // RECORD.size
+    index = 0 if start is None else _first_index_at_or_after(f, count, start)
+    f.seek(index * RECORD.size)
+
+    while index < count:
+        rows = min(chunk_size, count - index)
+        chunk = list(RECORD.iter_unpack(f.read(rows * RECORD.size)))
+        index += rows
+        if end is not None and chunk[-1][0] >= end:
+            chunk = [row for row in chunk if row[0] < end]
+            if chunk:
+                yield chunk
+            return
+        yield chunk
+
+def iter_telemetry_chunks(
+    file_path: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    chunk_size: int = 8192
+) -> Iterator[list[tuple]]:
+    """
+    Yield telemetry records with `start <= timestamp < end` from `file_path`
+    and its rotated backups, in chunks of at most `chunk_size` rows, so memory
+    use does not depend on the range size. Records are time ordered, so
+    `start` is located by binary search.
+
+    The files are opened immediately, so a missing `file_path` raises
+    FileNotFoundError here and a rollover during the export cannot shift them.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"No telemetry recorded at {file_path}")
+    files = []
+    for path in telemetry_files(file_path):
+        try:
+            files.append(open(path, "rb"))
+        except FileNotFoundError:
+            continue
+
+    def generate() -> Iterator[list[tuple]]:
+        try:
+            for f in files:
+                yield from _iter_file_chunks(f, start, end, chunk_size)
+        finally:
+            for f in files:
+                f.close()
+
+    return generate()
+
+def iter_csv(chunks: Iterable[list[tuple]]) -> Iterator[bytes]:
+    yield CSV_HEADER.encode("utf-8")
+    for chunk in chunks:
+        lines = []
+        for timestamp, status, temperature, power, fan_speed in chunk:
+            lines.append(
+                f"{datetime.fromtimestamp(timestamp, timezone.utc).isoformat()},"
+                f"{STATUSES[status].value},{temperature:.1f},"
+                f"{'' if math.isnan(power) else format(power, '.1f')},{fan_speed}\n"
+            )
+        yield "".join(lines).encode("utf-8")
+
+def iter_arrow_ipc(chunks: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """Encode chunks as an Arrow IPC stream, one record batch per chunk."""
+    import pyarrow as pa
+
+    status_type = pa.dictionary(pa.int8(), pa.string())
+    statuses = pa.array([status.value for status in STATUSES])
+    schema = pa.schema([
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("status", status_type),
+        ("temperature", pa.float32()),
+        ("power", pa.float32()),
+        ("fan_speed", pa.uint8()),
+    ])
+
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield drain()
+        for chunk in chunks:
+            timestamps, status, temperature, power, fan_speed = zip(*chunk)
+            writer.write_batch(pa.record_batch([
+                pa.array([int(t * 1_000_000) for t in timestamps], schema.field("timestamp").type),
+                pa.DictionaryArray.from_arrays(pa.array(status, pa.int8()), statuses),
+                pa.array(temperature, pa.float32()),
+                pa.array(power, pa.float32(), from_pandas=True),
+                pa.array(fan_speed, pa.uint8()),
+            ], schema=schema))
+            yield drain()
+    yield drain()
+
+EXPORT_ENCODERS = {
+    ExportFormat.CSV: (iter_csv, "text/csv"),
+    ExportFormat.ARROW_IPC: (iter_arrow_ipc, "application/vnd.apache.arrow.stream"),
+}
@@ -1,5 +1,5 @@
 from typing import Optional
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 def to_uint32(value: float, max_value: Optional[int] = None) -> int:
     """
@@ -29,3 +29,19 @@ def format_uptime(seconds: int) -> str:
     uptime = timedelta(seconds = seconds)
 
     return str(uptime)
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    Parse a unix timestamp or an ISO 8601 date/time into unix seconds.
+
+    Args:
+        value (str): e.g. '1744148823.5' or '2025-04-08T21:47:03+00:00'.
+
+    Returns:
+        float: Seconds since the epoch. Naive date/times are taken as local time.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
@@ -1,9 +1,17 @@
 from fastapi import WebSocket
-from typing import List
+from typing import Callable, Dict, List, Tuple
+from models import StateSubscription
+import asyncio
+import json
+import logging
+import time
 
 class WebSocketHub:
-    def __init__(self):
+    def __init__(self, send_timeout: float = 0.5):
         self.active_connections: List[WebSocket] = []
+        self.send_timeout = send_timeout
+        self.subscriptions: Dict[WebSocket, StateSubscription] = {}
+        self.next_due: Dict[tuple, float] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
@@ -12,6 +20,21 @@ class WebSocketHub:
     def disconnect(self, websocket:WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.subscriptions.pop(websocket, None)
+
+    def subscribe(self, websocket: WebSocket, subscription: StateSubscription):
+        if websocket in self.active_connections:
+            self.subscriptions[websocket] = subscription
+
+    def subscription_groups(self) -> Dict[tuple, Tuple[StateSubscription, List[WebSocket]]]:
+        """Group subscribed connections by identical filters."""
+        groups: Dict[tuple, Tuple[StateSubscription, List[WebSocket]]] = {}
+        for websocket, subscription in self.subscriptions.items():
+            key = subscription.key()
+            if key not in groups:
+                groups[key] = (subscription, [])
+            groups[key][1].append(websocket)
+        return groups
 
     async def send_json(self, data: dict, websocket: WebSocket):
         if websocket in self.active_connections:
@@ -20,3 +43,77 @@ class WebSocketHub:
     async def broadcast_json(self, data: dict):
         for connection in self.active_connections:
             await connection.send_json(data)
+
+    async def _send_text(self, websocket: WebSocket, message: str) -> bool:
+        try:
+            await asyncio.wait_for(websocket.send_text(message), self.send_timeout)
+            return True
+        except asyncio.TimeoutError:
+            logging.warning("Dropping state subscriber: send timed out")
+        except Exception as e:
+            logging.warning(f"Dropping state subscriber: {str(e)}")
+        return False
+
+    async def publish_states(self, states: Dict[str, dict], now: float | None = None, jitter: float = 0.0):
+        """
+        Send one tick of robot states to subscribers.
+
+        Each group of identical subscriptions keeps its own next-due time, so
+        it never receives more than `max_rate` frames per second; `jitter`
+        absorbs ticks that fire slightly early. Every distinct
+        (robot, fields) frame is encoded once per tick and shared by all
+        groups and connections that need it. Sends run concurrently with a
+        timeout, so a client that stops reading is dropped instead of
+        stalling everyone else.
+        """
+        now = time.monotonic() if now is None else now
+        groups = self.subscription_groups()
+        self.next_due = {key: due for key, due in self.next_due.items() if key in groups}
+        encoded: Dict[tuple, str] = {}
+        outgoing: Dict[WebSocket, List[str]] = {}
+
+        for key, (subscription, connections) in groups.items():
+            due = self.next_due.get(key)
+            if due is not None and now < due - jitter:
+                continue
+            interval = 1 / subscription.max_rate
+            next_due = now + interval if due is None else due + interval
+            # after a stall, restart the schedule instead of bursting to catch up
+            self.next_due[key] = next_due if next_due > now else now + interval
+
+            fields_key = key[1]
+            for robot_id, state in states.items():
+                if not subscription.matches(robot_id):
+                    continue
+                frame_key = (robot_id, fields_key)
+                if frame_key not in encoded:
+                    encoded[frame_key] = json.dumps(subscription.select(robot_id, state))
+                for connection in connections:
+                    outgoing.setdefault(connection, []).append(encoded[frame_key])
+
+        async def deliver(connection: WebSocket, messages: List[str]) -> bool:
+            for message in messages:
+                if not await self._send_text(connection, message):
+                    return False
+            return True
+
+        connections = list(outgoing)
+        delivered = await asyncio.gather(*(deliver(c, outgoing[c]) for c in connections))
+        dropped = [connection for connection, ok in zip(connections, delivered) if not ok]
+        for connection in dropped:
+            self.disconnect(connection)
+        await asyncio.gather(*(self._close(connection) for connection in dropped))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1008), self.send_timeout)
+        except Exception:
+            pass
+
+    async def publish_periodically(self, get_states: Callable[[], Dict[str, dict]], refresh_rate: int):
+        """Publish states at `refresh_rate` Hz; per-group rates are capped by it."""
+        interval = 1 / refresh_rate
+        while True:
+            if self.subscriptions:
+                await self.publish_states(get_states(), jitter=interval / 10)
+            await asyncio.sleep(interval)
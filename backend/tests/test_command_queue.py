@@ -0,0 +1,71 @@
+import unittest
+from models import RobotControlCommand, RobotStatus, FanMode
+from services.command_queue import CommandQueue, IdempotencyKeyConflict
+from services.robot_service import RobotService
+
+class TestCommandQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = CommandQueue()
+
+    def test_successive_fan_speed_commands_coalesce(self):
+        self.queue.put(RobotControlCommand(action="fan", fan_mode="static"))
+        for speed in (10, 20, 30):
+            self.queue.put(RobotControlCommand(action="fan_speed", fan_speed=speed))
+
+        self.assertEqual(len(self.queue), 2)
+        self.assertEqual(self.queue.stats()["coalesced"], 2)
+        commands = self.queue.drain()
+        self.assertEqual(commands[-1].fan_speed, 30)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_fan_speed_not_coalesced_across_other_commands(self):
+        self.queue.put(RobotControlCommand(action="fan_speed", fan_speed=10))
+        self.queue.put(RobotControlCommand(action="on"))
+        self.queue.put(RobotControlCommand(action="fan_speed", fan_speed=20))
+        self.assertEqual(len(self.queue), 3)
+
+    def test_idempotency_key_deduplicates_retries(self):
+        self.assertTrue(self.queue.put(RobotControlCommand(action="on", idempotency_key="abc")))
+        self.assertFalse(self.queue.put(RobotControlCommand(action="on", idempotency_key="abc")))
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(self.queue.stats()["deduplicated"], 1)
+
+    def test_idempotency_key_reused_for_different_command(self):
+        self.queue.put(RobotControlCommand(action="on", idempotency_key="k"))
+        with self.assertRaises(IdempotencyKeyConflict):
+            self.queue.put(RobotControlCommand(action="off", idempotency_key="k"))
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(self.queue.stats()["deduplicated"], 0)
+
+    def test_remembered_keys_are_bounded(self):
+        queue = CommandQueue(max_remembered_keys=2)
+        for key in ("a", "b", "c"):
+            queue.put(RobotControlCommand(action="on", idempotency_key=key))
+        self.assertTrue(queue.put(RobotControlCommand(action="on", idempotency_key="a")))
+
+class TestRobotServiceCommands(unittest.TestCase):
+    def setUp(self):
+        self.robot_service = RobotService()
+
+    def test_commands_applied_at_tick(self):
+        self.robot_service.enqueue_command(RobotControlCommand(action="on"))
+        self.robot_service.enqueue_command(RobotControlCommand(action="fan", fan_mode="static"))
+        self.robot_service.enqueue_command(RobotControlCommand(action="fan_speed", fan_speed=40))
+        self.robot_service.enqueue_command(RobotControlCommand(action="fan_speed", fan_speed=55))
+        self.assertEqual(self.robot_service.status, RobotStatus.IDLE)
+
+        self.assertEqual(self.robot_service.apply_pending_commands(), 3)
+        self.assertEqual(self.robot_service.status, RobotStatus.RUNNING)
+        self.assertEqual(self.robot_service.fan_mode, FanMode.STATIC)
+        self.assertEqual(self.robot_service.fan_speed, 55)
+        self.assertEqual(self.robot_service.command_queue.stats()["applied"], 3)
+
+    def test_no_op_commands_counted_as_failed(self):
+        self.robot_service.enqueue_command(RobotControlCommand(action="fan_speed", fan_speed=40))
+        self.robot_service.enqueue_command(RobotControlCommand(action="on"))
+        self.robot_service.enqueue_command(RobotControlCommand(action="on"))
+        self.robot_service.apply_pending_commands()
+
+        stats = self.robot_service.command_queue.stats()
+        self.assertEqual(stats["applied"], 1)
+        self.assertEqual(stats["failed"], 2)
@@ -6,12 +6,12 @@ client = TestClient(app)
 def test_control_robot_turn_on():
     response = client.post("/control", json={"action": "on"})
     assert response.status_code == 200
-    assert response.json() == {"status": "success", "action": "on"}
+    assert response.json() == {"status": "queued", "action": "on"}
 
 def test_control_robot_turn_off():
     response = client.post("/control", json={"action": "off"})
     assert response.status_code == 200
-    assert response.json() == {"status": "success", "action": "off"}
+    assert response.json() == {"status": "queued", "action": "off"}
 
 def test_control_robot_invalid_action():
     response = client.post("/control", json={"action": "invalid_action"})
@@ -21,3 +21,24 @@ def test_fan_action_requires_fan_mode():
     response = client.post("/control", json={"action": "fan"})
     assert response.status_code == 422  # Unprocessable Entity
     assert "fan_mode is required" in response.json()["detail"]
+
+def test_control_queue_stats():
+    response = client.get("/control/queue")
+    assert response.status_code == 200
+    assert set(response.json()) == {"depth", "enqueued", "coalesced", "deduplicated", "applied", "failed"}
+
+def test_control_idempotency_key_header():
+    before = client.get("/control/queue").json()["deduplicated"]
+    statuses = []
+    for _ in range(2):
+        response = client.post("/control", json={"action": "reset"}, headers={"Idempotency-Key": "retry-1"})
+        assert response.status_code == 200
+        statuses.append(response.json()["status"])
+    assert statuses == ["queued", "duplicate"]
+    assert client.get("/control/queue").json()["deduplicated"] == before + 1
+
+def test_control_idempotency_key_reused_for_different_command():
+    response = client.post("/control", json={"action": "on", "idempotency_key": "conflict-1"})
+    assert response.json()["status"] == "queued"
+    response = client.post("/control", json={"action": "off", "idempotency_key": "conflict-1"})
+    assert response.status_code == 409
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import tempfile
+import math
+import time
+import unittest
+from unittest import mock
+from models import RobotSnapshot, RobotStatus, FanMode
+from services.robot_service import RobotService
+from utils.snapshot import encode_snapshot, decode_snapshot, write_snapshot, read_snapshot
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "robot_snapshot.bin")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        snapshots = [
+            RobotSnapshot(f"robot-{i}", RobotStatus.RUNNING, FanMode.STATIC, i % 101, 1000.5 + i)
+            for i in range(10_000)
+        ]
+        write_snapshot(self.path, encode_snapshot(snapshots))
+        self.assertEqual(read_snapshot(self.path), snapshots)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["robot_snapshot.bin"])
+
+    def test_corrupted_snapshot_raises(self):
+        data = encode_snapshot([RobotSnapshot("robot-1", RobotStatus.IDLE, FanMode.PROPORTIONAL, 40, 0.0)])
+        with self.assertRaises(ValueError):
+            decode_snapshot(data[:-3])
+        with self.assertRaises(ValueError):
+            decode_snapshot(b"nope" + data[4:])
+
+    def test_checksum_mismatch_raises(self):
+        data = bytearray(encode_snapshot([RobotSnapshot("robot-1", RobotStatus.IDLE, FanMode.STATIC, 40, 0.0)]))
+        data[-1] ^= 0xFF
+        with self.assertRaises(ValueError):
+            decode_snapshot(bytes(data))
+
+    def test_out_of_range_values_raise(self):
+        for snapshot in (
+            RobotSnapshot("robot-1", RobotStatus.IDLE, FanMode.STATIC, 200, 0.0),
+            RobotSnapshot("robot-1", RobotStatus.IDLE, FanMode.STATIC, 40, math.nan),
+        ):
+            with self.assertRaises(ValueError):
+                decode_snapshot(encode_snapshot([snapshot]))
+
+    def test_failed_restore_keeps_current_state(self):
+        robot_service = RobotService()
+        with self.assertRaises(ValueError):
+            robot_service.restore(RobotSnapshot("robot-1", RobotStatus.RUNNING, FanMode.STATIC, 50, math.nan))
+        self.assertEqual(robot_service.status, RobotStatus.IDLE)
+        self.assertEqual(robot_service.fan_mode, FanMode.PROPORTIONAL)
+        self.assertTrue(math.isfinite(robot_service.start_time))
+
+    def test_cancelled_periodic_write_finishes_before_final_save(self):
+        robot_service = RobotService()
+        written = []
+
+        def slow_write(file_path, data):
+            time.sleep(0.05)
+            written.append(decode_snapshot(data)[0].status)
+
+        async def run():
+            task = asyncio.create_task(robot_service.save_snapshot_periodically(self.path, 0))
+            await asyncio.sleep(0.01)
+            robot_service.turn_on()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await robot_service.save_snapshot_async(self.path)
+
+        with mock.patch("services.robot_service.write_snapshot", slow_write):
+            asyncio.run(run())
+        self.assertEqual(written, [RobotStatus.IDLE, RobotStatus.RUNNING])
+
+    def test_robot_service_restores_settings(self):
+        robot_service = RobotService()
+        robot_service.turn_on()
+        robot_service.set_fan_mode(FanMode.STATIC)
+        robot_service.set_fan_speed(65)
+        robot_service.start_time = time.time() - 120
+        robot_service.save_snapshot(self.path)
+
+        restored = RobotService()
+        self.assertTrue(restored.load_snapshot(self.path))
+        self.assertEqual(restored.status, RobotStatus.RUNNING)
+        self.assertEqual(restored.fan_mode, FanMode.STATIC)
+        self.assertEqual(restored.fan_speed, 65)
+        self.assertGreaterEqual(restored.get_uptime(), 120)
+
+    def test_other_robot_ids_are_ignored(self):
+        RobotService(robot_id="robot-2").save_snapshot(self.path)
+        self.assertFalse(RobotService().load_snapshot(self.path))
+
+    def test_periodic_snapshot_survives_unencodable_state(self):
+        robot_service = RobotService()
+        robot_service.fan_mode = None
+
+        async def run():
+            task = asyncio.create_task(robot_service.save_snapshot_periodically(self.path, 0.01))
+            await asyncio.sleep(0.05)
+            self.assertFalse(task.done())
+            task.cancel()
+
+        with self.assertLogs("services.robot_service", level="ERROR"):
+            asyncio.run(run())
+        self.assertFalse(os.path.exists(self.path))
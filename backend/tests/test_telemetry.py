@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+import pyarrow as pa
+from fastapi.testclient import TestClient
+from config import config
+from export import export_telemetry
+from main import app
+from models import RobotState, RobotStatus, ExportFormat
+from services.robot_service import RobotService
+from utils.telemetry import TelemetryRecorder, RECORD, iter_telemetry_chunks, iter_csv, iter_arrow_ipc
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "robot_telemetry.bin")
+        recorder = TelemetryRecorder(self.path)
+        for i in range(100):
+            status = RobotStatus.RUNNING if i % 2 else RobotStatus.IDLE
+            state = RobotState(temperature=20 + i / 10, power=15.0, status=status, fan_speed=i, uptime=i, logs=[])
+            recorder.record(state, timestamp=1000.0 + i)
+        recorder.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_chunks_respect_range_and_size(self):
+        chunks = list(iter_telemetry_chunks(self.path, start=1010, end=1050, chunk_size=16))
+        self.assertTrue(all(len(chunk) <= 16 for chunk in chunks))
+        timestamps = [row[0] for chunk in chunks for row in chunk]
+        self.assertEqual(timestamps, [1000.0 + i for i in range(10, 50)])
+
+    def test_recorder_drops_partial_record(self):
+        with open(self.path, "ab") as f:
+            f.write(b"\x00" * (RECORD.size - 1))
+        TelemetryRecorder(self.path).close()
+        self.assertEqual(os.path.getsize(self.path), 100 * RECORD.size)
+
+    def test_csv(self):
+        lines = b"".join(iter_csv(iter_telemetry_chunks(self.path, end=1002))).decode().splitlines()
+        self.assertEqual(lines[0], "timestamp,status,temperature,power,fan_speed")
+        self.assertEqual(lines[2], "1970-01-01T00:16:41+00:00,running,20.1,15.0,1")
+        self.assertEqual(len(lines), 3)
+
+    def test_arrow_ipc(self):
+        data = b"".join(iter_arrow_ipc(iter_telemetry_chunks(self.path, chunk_size=30)))
+        table = pa.ipc.open_stream(data).read_all()
+        self.assertEqual(table.num_rows, 100)
+        self.assertEqual(table.column("fan_speed").to_pylist(), list(range(100)))
+        self.assertEqual(table.column("status")[1].as_py(), "running")
+
+    def test_export_to_file(self):
+        output = os.path.join(self.tmp_dir.name, "out.csv")
+        written = export_telemetry(self.path, output, 1090, None, ExportFormat.CSV)
+        self.assertEqual(os.path.getsize(output), written)
+        with open(output) as f:
+            self.assertEqual(len(f.readlines()), 11)
+
+    def test_export_endpoint(self):
+        client = TestClient(app)
+        original_path = config.telemetry_path
+        config.telemetry_path = self.path
+        try:
+            response = client.get("/export", params={"from": "1095", "format": "csv"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.text.splitlines()), 6)
+
+            response = client.get("/export", params={"to": "yesterday"})
+            self.assertEqual(response.status_code, 400)
+        finally:
+            config.telemetry_path = original_path
+
+    def test_export_missing_input_creates_no_output(self):
+        output = os.path.join(self.tmp_dir.name, "out.csv")
+        with self.assertRaises(FileNotFoundError):
+            export_telemetry(os.path.join(self.tmp_dir.name, "missing.bin"), output, None, None, ExportFormat.CSV)
+        self.assertFalse(os.path.exists(output))
+
+    def test_recorder_keeps_timestamps_non_decreasing(self):
+        recorder = TelemetryRecorder(self.path)
+        state = RobotState(temperature=20, power=15.0, status=RobotStatus.IDLE, fan_speed=40, uptime=0, logs=[])
+        recorder.record(state, timestamp=500.0)
+        recorder.close()
+        timestamps = [row[0] for chunk in iter_telemetry_chunks(self.path) for row in chunk]
+        self.assertEqual(timestamps[-1], 1099.0)
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_rotation_keeps_backups_and_exports_across_files(self):
+        path = os.path.join(self.tmp_dir.name, "rotating.bin")
+        recorder = TelemetryRecorder(path, max_bytes=10 * RECORD.size, backup_count=2)
+        for i in range(35):
+            state = RobotState(temperature=20, power=15.0, status=RobotStatus.IDLE, fan_speed=i, uptime=i, logs=[])
+            recorder.record(state, timestamp=2000.0 + i)
+        recorder.close()
+
+        self.assertEqual(os.path.getsize(path), 5 * RECORD.size)
+        self.assertFalse(os.path.exists(f"{path}.3"))
+        timestamps = [row[0] for chunk in iter_telemetry_chunks(path, start=2012, end=2032) for row in chunk]
+        self.assertEqual(timestamps, [2000.0 + i for i in range(12, 32)])
+        first = next(iter_telemetry_chunks(path))[0][0]
+        self.assertEqual(first, 2010.0)
+
+    def test_record_failures_do_not_stop_state_loop(self):
+        robot_service = RobotService()
+        robot_service.robot_state = robot_service.get_state()
+        robot_service.telemetry = TelemetryRecorder(self.path)
+        robot_service.telemetry.file.close()
+
+        with self.assertLogs("services.robot_service", level="ERROR"):
+            for _ in range(robot_service.max_telemetry_failures):
+                robot_service.record_telemetry()
+        self.assertIsNone(robot_service.telemetry)
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import unittest
+from models import StateSubscription, StateField
+from websockethub import WebSocketHub
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.sent.append(data)
+
+class TestWebSocketHub(unittest.TestCase):
+    def setUp(self):
+        self.hub = WebSocketHub()
+        self.states = {
+            "robot-1": {"temperature": 25.0, "power": 16.0, "status": "running", "fan_speed": 70, "uptime": 5},
+            "robot-2": {"temperature": 22.0, "power": 8.0, "status": "idle", "fan_speed": 40, "uptime": 3},
+        }
+
+    def connect(self, subscription: StateSubscription) -> FakeWebSocket:
+        websocket = FakeWebSocket()
+        asyncio.run(self.hub.connect(websocket))
+        self.hub.subscribe(websocket, subscription)
+        return websocket
+
+    def test_filters_robots_and_fields(self):
+        websocket = self.connect(StateSubscription(robot_ids=["robot-2"], fields=[StateField.POWER]))
+        asyncio.run(self.hub.publish_states(self.states, now=0.0))
+        self.assertEqual([json.loads(m) for m in websocket.sent], [{"robot_id": "robot-2", "power": 8.0}])
+
+    def test_identical_subscriptions_share_encoded_frame(self):
+        first = self.connect(StateSubscription(fields=[StateField.STATUS, StateField.UPTIME]))
+        second = self.connect(StateSubscription(fields=[StateField.UPTIME, StateField.STATUS]))
+        self.assertEqual(len(self.hub.subscription_groups()), 1)
+
+        asyncio.run(self.hub.publish_states(self.states, now=0.0))
+        self.assertEqual(len(first.sent), 2)
+        for a, b in zip(first.sent, second.sent):
+            self.assertIs(a, b)
+
+    def test_max_rate_is_applied_per_group(self):
+        slow = self.connect(StateSubscription(max_rate=1))
+        fast = self.connect(StateSubscription(max_rate=10))
+        for tick in range(10):
+            asyncio.run(self.hub.publish_states({"robot-1": self.states["robot-1"]}, now=tick * 0.1, jitter=0.01))
+        self.assertEqual(len(slow.sent), 1)
+        self.assertEqual(len(fast.sent), 10)
+
+    def test_rate_not_dividing_refresh_rate_is_not_exceeded(self):
+        for max_rate, expected in ((7, 70), (3, 30)):
+            hub = WebSocketHub()
+            websocket = FakeWebSocket()
+            asyncio.run(hub.connect(websocket))
+            hub.subscribe(websocket, StateSubscription(max_rate=max_rate))
+            for tick in range(100):
+                asyncio.run(hub.publish_states({"robot-1": self.states["robot-1"]}, now=tick * 0.1, jitter=0.01))
+            self.assertLessEqual(len(websocket.sent), expected)
+            self.assertGreaterEqual(len(websocket.sent), expected - 1)
+
+    def test_frames_shared_across_groups_with_same_fields(self):
+        first = self.connect(StateSubscription(fields=[StateField.POWER], max_rate=1))
+        second = self.connect(StateSubscription(fields=[StateField.POWER], max_rate=5))
+        self.assertEqual(len(self.hub.subscription_groups()), 2)
+
+        asyncio.run(self.hub.publish_states(self.states, now=0.0))
+        for a, b in zip(first.sent, second.sent):
+            self.assertIs(a, b)
+
+    def test_disconnect_removes_subscription(self):
+        websocket = self.connect(StateSubscription())
+        self.hub.disconnect(websocket)
+        asyncio.run(self.hub.publish_states(self.states, now=0.0))
+        self.assertEqual(websocket.sent, [])
+        self.assertEqual(self.hub.subscription_groups(), {})
+
+    def test_stalled_subscriber_is_dropped_without_blocking_others(self):
+        class StalledWebSocket(FakeWebSocket):
+            async def send_text(self, data: str):
+                await asyncio.sleep(10)
+
+        self.hub.send_timeout = 0.05
+        stalled = StalledWebSocket()
+        asyncio.run(self.hub.connect(stalled))
+        self.hub.subscribe(stalled, StateSubscription())
+        healthy = self.connect(StateSubscription())
+
+        asyncio.run(self.hub.publish_states(self.states, now=0.0))
+        self.assertEqual(len(healthy.sent), 2)
+        self.assertNotIn(stalled, self.hub.active_connections)